@@ -6,12 +6,25 @@ import numpy as np
 import os
 import psf_library.cleaning as psf_clean
 import psf_library.calcs as psf_calc
+import psf_library.analytics as psf_analytics
+from functools import lru_cache
+from itertools import combinations
+
+# Storage dtype for the data and plots, set PSF_DTYPE=float64 for full precision output
+psf_calc.set_storage_dtype(os.environ.get("PSF_DTYPE", "float32"))
+
+DATA_PATH = "data/10Y_Daily_Returns.csv"
+
+# Only the header is read at startup for the index options, the returns are loaded on the first render
+index_options = [col for col in pd.read_csv(DATA_PATH, nrows=0).columns if col != "date"]
 
 # Load and prep data
-daily_df = pd.read_csv("data/10Y_Daily_Returns.csv")
-split = psf_clean.split_columns_to_dfs(daily_df, "date")
+@lru_cache(maxsize=None)
+def load_data():
+    daily_df = pd.read_csv(DATA_PATH)
+    split = psf_clean.split_columns_to_dfs(daily_df, "date")
+    return daily_df, split
 
-index_options = list(split.keys())
 window_options = [1, 3, 5]
 
 app_ui = ui.page_fluid(
@@ -43,8 +56,14 @@ app_ui = ui.page_fluid(
     output_widget("rolling_return_plot"),
     output_widget("volatility_plot"),
     output_widget("sharpe_plot"),
+    output_widget("correlation_plot"),
+    output_widget("drawdown_plot"),
 )
 
+# Sends the dates as epoch milliseconds, plotly packs these into a binary array instead of a long date string per point
+def plot_dates(index):
+    return pd.DatetimeIndex(index).as_unit('ms').asi8.astype('float64')
+
 def create_plot(selected_index, window_years):
     fig1 = go.Figure()
     fig2 = go.Figure()
@@ -52,24 +71,26 @@ def create_plot(selected_index, window_years):
     fig4 = go.Figure()
     fig5 = go.Figure()
 
+    split = load_data()[1]
     for idx in selected_index:
         df = split[idx]
         rolling_returns = psf_calc.compute_rolling_returns(df, window_years, 0.04)
+        dates = plot_dates(rolling_returns.index)
 
         # Plot 1: Cumulative Return
-        fig1.add_trace(go.Scatter(x=rolling_returns.index, y=rolling_returns['cumulative_return'], mode='lines', name=idx))
+        fig1.add_trace(go.Scatter(x=dates, y=rolling_returns['cumulative_return'], mode='lines', name=idx))
 
         # Plot 2: Rolling Cumulative
-        fig2.add_trace(go.Scatter(x=rolling_returns.index, y=rolling_returns['rolling_cumulative_return'], mode='lines', name=idx))
+        fig2.add_trace(go.Scatter(x=dates, y=rolling_returns['rolling_cumulative_return'], mode='lines', name=idx))
 
         # Plot 3: Annualized Return
-        fig3.add_trace(go.Scatter(x=rolling_returns.index, y=rolling_returns['annualized_return'], mode='lines', name=idx))
+        fig3.add_trace(go.Scatter(x=dates, y=rolling_returns['annualized_return'], mode='lines', name=idx))
 
         # Plot 4: Volatility
-        fig4.add_trace(go.Scatter(x=rolling_returns.index, y=rolling_returns['rolling_volatility'], mode='lines', name=idx))
+        fig4.add_trace(go.Scatter(x=dates, y=rolling_returns['rolling_volatility'], mode='lines', name=idx))
 
         # Plot 5: Sharpe
-        fig5.add_trace(go.Scatter(x=rolling_returns.index, y=rolling_returns['rolling_sharpe'], mode='lines', name=idx))
+        fig5.add_trace(go.Scatter(x=dates, y=rolling_returns['rolling_sharpe'], mode='lines', name=idx))
 
     for fig, title, ytitle, format_ in [
         (fig1, "Cumulative Return", "Cumulative Return", ".0%"),
@@ -81,6 +102,7 @@ def create_plot(selected_index, window_years):
         fig.update_layout(
             title=title,
             xaxis_title="Date",
+            xaxis_type="date",
             yaxis_title=ytitle,
             hovermode="x unified",
             template="plotly_white",
@@ -89,6 +111,44 @@ def create_plot(selected_index, window_years):
 
     return fig1, fig2, fig3, fig4, fig5
 
+# Computes the correlation of every pair of indexes at once per window, so changing the selected indexes is only a lookup
+# Only the upper triangle is kept and only the last two windows are cached to bound the memory with large universes
+@lru_cache(maxsize=2)
+def correlation_matrices(window_years):
+    return psf_analytics.rolling_corr_condensed(load_data()[0], window_years * 252)
+
+def create_analytics_plot(selected_index, window_years):
+    fig6 = go.Figure()
+    fig7 = go.Figure()
+
+    # Plot 6: Rolling Correlation for every pair of selected indexes
+    corrs, dates, columns = correlation_matrices(window_years)
+    pairs_df = psf_analytics.corr_pairs_to_df(corrs, dates, columns, combinations(selected_index, 2))
+    for pair in pairs_df.columns:
+        fig6.add_trace(go.Scatter(x=plot_dates(pairs_df.index), y=pairs_df[pair], mode='lines', name=pair))
+
+    # Plot 7: Drawdown
+    split = load_data()[1]
+    for idx in selected_index:
+        drawdowns = psf_analytics.compute_drawdowns(split[idx])
+        fig7.add_trace(go.Scatter(x=plot_dates(drawdowns.index), y=drawdowns['drawdown'], mode='lines', name=idx))
+
+    for fig, title, ytitle, format_ in [
+        (fig6, f"{window_years}Y Rolling Correlation", "Correlation", ".2f"),
+        (fig7, "Drawdown", "Drawdown", ".0%")
+    ]:
+        fig.update_layout(
+            title=title,
+            xaxis_title="Date",
+            xaxis_type="date",
+            yaxis_title=ytitle,
+            hovermode="x unified",
+            template="plotly_white",
+            yaxis=dict(tickformat=format_)
+        )
+
+    return fig6, fig7
+
 
 def server(input, output, session):
     @render_widget
@@ -116,6 +176,16 @@ def server(input, output, session):
         return create_plot(input.indexes(), int(input.window()))[4]
     output.sharpe_plot = sharpe_plot
 
+    @render_widget
+    def correlation_plot():
+        return create_analytics_plot(input.indexes(), int(input.window()))[0]
+    output.correlation_plot = correlation_plot
+
+    @render_widget
+    def drawdown_plot():
+        return create_analytics_plot(input.indexes(), int(input.window()))[1]
+    output.drawdown_plot = drawdown_plot
+
 app = App(app_ui, server)
 
 if __name__ == "__main__":
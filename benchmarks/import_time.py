@@ -0,0 +1,96 @@
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+'''
+Measures how long it takes to import the dashboard (or any module) on a cold interpreter using python -X importtime
+Each run is done in a fresh process, the median time spent importing our own package (and anything it pulls in first) is checked against the budget
+The total time for the module is only reported, most of it is shiny and pandas which we don't control and which is too noisy to budget
+Also checks that modules the dashboard doesn't need (matplotlib) are not pulled in during startup
+Run from the repo root: python benchmarks/import_time.py --module app --package psf_library --budget-ms 50
+'''
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Parses the -X importtime output into a list of (level, module, self_us, cumulative_us) in the order they were printed
+def parse_importtime(stderr):
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Each level of nesting adds two spaces in front of the name
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((level, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+# Adds up the cumulative time of the outermost imports of the package, so submodules aren't counted twice
+def package_time_us(entries, package):
+    total = 0
+    stack = []
+
+    # The output lists children before their parent, so going backwards gives each parent before its children
+    for level, name, _, cumulative_us in reversed(entries):
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        inside = stack[-1][1] if stack else False
+
+        is_package = name == package or name.startswith(package + '.')
+        if is_package and not inside:
+            total += cumulative_us
+        stack.append((level, inside or is_package))
+
+    return total
+
+# Imports the module in a new interpreter and gives back the parsed import times
+def measure_import(module):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time benchmark with a budget check")
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--package', default='psf_library', help="Package whose import time is checked against the budget")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=50)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--forbid', nargs='*', default=['matplotlib'])
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    totals_ms = [{name: cumulative_us for _, name, _, cumulative_us in run}[args.module] / 1000 for run in runs]
+    package_ms = [package_time_us(run, args.package) / 1000 for run in runs]
+    median_ms = statistics.median(package_ms)
+
+    # Shows the heaviest top level packages from the last run
+    last = {name: cumulative_us for _, name, _, cumulative_us in runs[-1]}
+    top_level = {name: cumulative_us for name, cumulative_us in last.items() if '.' not in name and name != args.module}
+    print(f"Heaviest packages imported by {args.module}:")
+    for name, cumulative_us in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    print(f"\n{args.module}: median {statistics.median(totals_ms):.1f} ms over {args.runs} runs "
+          f"(min {min(totals_ms):.1f} ms, max {max(totals_ms):.1f} ms)")
+    print(f"{args.package}: median {median_ms:.1f} ms (min {min(package_ms):.1f} ms, max {max(package_ms):.1f} ms), "
+          f"budget {args.budget_ms:.0f} ms")
+
+    failed = False
+    loaded = [name for name in args.forbid if name in last]
+    if loaded:
+        print(f"FAIL: {', '.join(loaded)} imported at startup")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: {args.package} is over the import time budget")
+        failed = True
+    if not failed:
+        print("OK")
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import csv
+import json
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import psutil
+import websockets
+
+'''
+Load test for the dashboard, simulates users changing the window and indexes inputs over the shiny websocket protocol
+Starts the app locally with uvicorn (or uses a running one with --url) and runs each session count for a fixed time
+Every input change is timed until each output widget has been sent back, which gives the time-to-render per output
+Shiny sends all the outputs that finished in the same flush together, so outputs that render in one flush share a time
+Each level reports the throughput, percentile latencies and the server CPU/RSS, so running several levels gives the saturation curve
+Run from the repo root: python benchmarks/load_test.py --sessions 1 2 4 8 16 --duration 30
+'''
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_PATH = ROOT / 'data' / '10Y_Daily_Returns.csv'
+
+WINDOW_OPTIONS = ['1', '3', '5']
+
+#### SERVER ####
+
+# Finds an open port for the local server
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+# Starts the app in its own process and waits until it answers
+def start_server(port, timeout=60):
+    process = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'app:app', '--port', str(port), '--log-level', 'warning'],
+                               cwd=ROOT)
+    url = f'http://127.0.0.1:{port}'
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("The app exited before it started serving")
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return process, url
+        except OSError:
+            time.sleep(0.25)
+
+    process.terminate()
+    raise RuntimeError(f"The app did not start within {timeout} seconds")
+
+# Gets the output ids from the page so the sessions can mark them as visible
+def discover_outputs(url):
+    html = urllib.request.urlopen(url).read().decode()
+    return re.findall(r'id="([^"]+)" class="[^"]*\bshiny-[\w-]*output\b', html)
+
+# Samples the CPU and memory of the server while a level is running
+async def monitor_server(process, samples, interval=0.5):
+    process.cpu_percent(None)
+    while True:
+        await asyncio.sleep(interval)
+        samples.append((process.cpu_percent(None), process.memory_info().rss))
+
+#### SESSIONS ####
+
+# Picks a new value for one of the inputs like a user would
+def random_change(index_options):
+    if random.random() < 0.5:
+        return {'window': random.choice(WINDOW_OPTIONS)}
+    return {'indexes': random.sample(index_options, random.randint(1, min(4, len(index_options))))}
+
+# Reads messages until every output has been sent back and the server is idle, gives back the time each output arrived
+async def wait_for_outputs(ws, outputs, start, timeout):
+    arrived = {}
+    idle = False
+
+    while not (idle and len(arrived) == len(outputs)):
+        message = json.loads(await asyncio.wait_for(ws.recv(), timeout))
+        now = time.perf_counter()
+
+        for key in ('values', 'errors'):
+            for name in message.get(key) or {}:
+                if name in outputs and name not in arrived:
+                    arrived[name] = now - start
+
+        if message.get('busy') == 'busy':
+            idle = False
+        elif message.get('busy') == 'idle':
+            idle = True
+
+    return arrived, time.perf_counter() - start
+
+# Runs one simulated user until the stop time, the first render after connecting is recorded separately
+async def run_session(ws_url, outputs, index_options, think_time, stop_at, results, timeout):
+    inputs = {
+        'window': random.choice(WINDOW_OPTIONS),
+        'indexes': random.sample(index_options, min(2, len(index_options))),
+        '.clientdata_url_search': '',
+    }
+    # Shiny suspends hidden outputs, so every output is reported as visible
+    for name in outputs:
+        inputs[f'.clientdata_output_{name}_hidden'] = False
+        inputs[f'.clientdata_output_{name}_width'] = 1000
+        inputs[f'.clientdata_output_{name}_height'] = 450
+
+    async with websockets.connect(ws_url, max_size=None) as ws:
+        start = time.perf_counter()
+        await ws.send(json.dumps({'method': 'init', 'data': inputs}))
+        arrived, total = await wait_for_outputs(ws, outputs, start, timeout)
+        results['initial'].append(total)
+
+        while time.perf_counter() < stop_at:
+            # Exponential think time between changes, like users clicking at random
+            await asyncio.sleep(random.expovariate(1 / think_time) if think_time > 0 else 0)
+            if time.perf_counter() >= stop_at:
+                break
+
+            start = time.perf_counter()
+            await ws.send(json.dumps({'method': 'update', 'data': random_change(index_options)}))
+            try:
+                arrived, total = await wait_for_outputs(ws, outputs, start, timeout)
+            except asyncio.TimeoutError:
+                # Late messages would be mixed into the next update, so the session stops here
+                results['timeouts'] += 1
+                break
+
+            results['updates'].append(total)
+            for name, elapsed in arrived.items():
+                results['outputs'].setdefault(name, []).append(elapsed)
+
+# Runs a number of sessions at the same time for the given duration
+async def run_level(ws_url, outputs, index_options, sessions, duration, think_time, server, timeout):
+    results = {'initial': [], 'updates': [], 'outputs': {}, 'timeouts': 0}
+    samples = []
+
+    monitor = asyncio.create_task(monitor_server(server, samples)) if server is not None else None
+    started = time.perf_counter()
+    stop_at = started + duration
+
+    tasks = [run_session(ws_url, outputs, index_options, think_time, stop_at, results, timeout) for _ in range(sessions)]
+    errors = [error for error in await asyncio.gather(*tasks, return_exceptions=True) if isinstance(error, Exception)]
+    elapsed = time.perf_counter() - started
+
+    if monitor is not None:
+        monitor.cancel()
+
+    results['errors'] = errors
+    results['elapsed'] = elapsed
+    results['samples'] = samples
+    return results
+
+#### REPORTING ####
+
+# Gives back the percentile of the values in milliseconds
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    if len(values) == 1:
+        return values[0] * 1000
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1] * 1000
+
+def format_latencies(values):
+    return f"p50 {percentile(values, 50):8.1f}  p90 {percentile(values, 90):8.1f}  p99 {percentile(values, 99):8.1f} ms  (n={len(values)})"
+
+# Prints the results of a single level
+def report_level(sessions, results):
+    print(f"\n=== {sessions} sessions ===")
+    print(f"  initial render           {format_latencies(results['initial'])}")
+    print(f"  full update              {format_latencies(results['updates'])}")
+    for name, values in sorted(results['outputs'].items()):
+        print(f"  {name:<24} {format_latencies(values)}")
+
+    throughput = len(results['updates']) / results['elapsed']
+    print(f"  throughput               {throughput:.2f} updates/s, {results['timeouts']} timeouts, {len(results['errors'])} session errors")
+    for error in results['errors'][:3]:
+        print(f"    {type(error).__name__}: {error}")
+
+    if results['samples']:
+        cpu = [sample[0] for sample in results['samples']]
+        rss = [sample[1] for sample in results['samples']]
+        print(f"  server CPU               mean {statistics.mean(cpu):.0f}%  max {max(cpu):.0f}%, peak RSS {max(rss) / 2**20:.0f} MB")
+
+    return throughput
+
+# Prints the throughput and latency at each level, the point where latency climbs while throughput flattens is the saturation point
+def report_saturation(curve):
+    print("\n=== Saturation curve ===")
+    print(f"  {'sessions':>8}  {'updates/s':>10}  {'p50 ms':>10}  {'p99 ms':>10}  {'CPU %':>6}")
+    for sessions, throughput, results in curve:
+        cpu = statistics.mean(sample[0] for sample in results['samples']) if results['samples'] else float('nan')
+        print(f"  {sessions:>8}  {throughput:>10.2f}  {percentile(results['updates'], 50):>10.1f}  "
+              f"{percentile(results['updates'], 99):>10.1f}  {cpu:>6.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard with simulated sessions")
+    parser.add_argument('--url', help="Use an app that is already running instead of starting one")
+    parser.add_argument('--pid', type=int, help="Process id of the running app for the CPU/RSS numbers when using --url")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--duration', type=float, default=20, help="Seconds to run each level")
+    parser.add_argument('--think-time', type=float, default=2, help="Mean seconds between a user's input changes")
+    parser.add_argument('--timeout', type=float, default=60, help="Seconds to wait for an update before counting a timeout")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    process = None
+    if args.url:
+        url = args.url.rstrip('/')
+        server = psutil.Process(args.pid) if args.pid else None
+    else:
+        process, url = start_server(free_port())
+        server = psutil.Process(process.pid)
+
+    try:
+        with open(DATA_PATH, newline='') as file:
+            index_options = [col for col in next(csv.reader(file)) if col != 'date']
+        outputs = discover_outputs(url)
+        ws_url = url.replace('http', 'ws', 1) + '/websocket/'
+        print(f"Testing {url} with outputs: {', '.join(outputs)}")
+
+        curve = []
+        for sessions in args.sessions:
+            results = asyncio.run(run_level(ws_url, outputs, index_options, sessions, args.duration,
+                                            args.think_time, server, args.timeout))
+            curve.append((sessions, report_level(sessions, results), results))
+
+        report_saturation(curve)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,37 @@
-from .calcs import z_score, compute_df_cumulative, compute_col_cumulative, annualized_return, to_ratio
-from .cleaning import data_prep, prep_dfs, process_indices, get_last_day_each_quarter, data_info, unique_values, color_selection
-from .plotting import point_label, table_builder, annotate_on_lines, annotate_on_scatter, simple_axes, style_axes_blank, style_axes_date, plot_basic_scatter, plot_colored_scatter
-from .building import fig_save_load, add_image
-
-__all__ = ['z_score', 'compute_df_cumulative', 'compute_col_cumulative', 'annualized_return', 'to_ratio',
-    'data_prep', 'prep_dfs', 'process_indices', 'get_last_day_each_quarter', 'data_info', 'unique_values', 'color_selection'
-    'point_label', 'table_builder', 'annotate_on_lines', 'annotate_on_scatter',
-    'create_subplots', 'simple_axes', 'style_axes_blank', 'style_axes_date', 'plot_basic_scatter', 'plot_colored_scatter'
-    'fig_save_load', 'add_image']
\ No newline at end of file
+import importlib
+
+'''
+The submodules are only imported the first time one of their functions is used through the package
+This keeps matplotlib (plotting, building) out of the dashboard, which only needs the calcs, cleaning and analytics
+'''
+
+# Lists which functions are given from each submodule
+_exports = {
+    'calcs': ['z_score', 'compute_df_cumulative', 'compute_col_cumulative', 'annualized_return', 'to_ratio', 'set_storage_dtype'],
+    'cleaning': ['data_prep', 'prep_dfs', 'process_indices', 'index_calculations', 'get_last_day_each_quarter', 'data_info', 'unique_values', 'color_selection'],
+    'plotting': ['point_label', 'table_builder', 'annotate_on_lines', 'annotate_on_scatter',
+        'simple_axes', 'style_axes_blank', 'style_axes_date', 'plot_basic_scatter', 'plot_colored_scatter'],
+    'building': ['fig_save_load', 'add_image'],
+    'analytics': ['rolling_cov_matrices', 'rolling_corr_matrices', 'rolling_corr_condensed', 'corr_pairs_to_df', 'compute_drawdown', 'compute_drawdown_duration', 'compute_drawdowns'],
+    'summary': ['build_period_stats', 'combine_periods', 'stats_mean', 'stats_z_score', 'stats_annualized_return'],
+}
+
+_export_module = {name: module for module, names in _exports.items() for name in names}
+
+__all__ = [name for names in _exports.values() for name in names]
+
+# Imports the submodule or function the first time it is asked for and saves it so later lookups skip this
+def __getattr__(name):
+    if name in _exports:
+        return importlib.import_module(f'.{name}', __name__)
+
+    if name in _export_module:
+        module = importlib.import_module(f'.{_export_module[name]}', __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_exports))
\ No newline at end of file
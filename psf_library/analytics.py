@@ -0,0 +1,152 @@
+import pandas as pd
+import numpy as np
+from .calcs import COMPUTE_DTYPE, to_storage_dtype
+
+'''
+Cross index analytics that the dashboard can show next to the return plots, rolling correlation and drawdowns
+The rolling covariance/correlation matrices are built in one pass over the dates by keeping rolling sums of the returns and their cross-products,
+so every pair of indexes is updated together instead of running a rolling corr for each pair
+The drawdown and drawdown duration only need the running peak, so they are a single pass over each index as well
+The running sums are kept in float64 and the matrices are only cast to the storage dtype when they are stored
+A pair is nan on any date where either index has a missing return in the window, which matches pandas rolling corr with the default min_periods
+'''
+
+# Streams through the returns and yields the rolling mean vector, covariance matrix and which columns had a full window
+def _rolling_moments(values, window):
+    n, k = values.shape
+
+    # Missing returns are added as 0 so they don't touch any other column's sums, the window is then marked as not full
+    missing = np.isnan(values)
+
+    # Centering on the column means keeps the running sums small so adding and dropping rows doesn't lose precision
+    filled = np.where(missing, 0.0, values)
+    counts = (~missing).sum(axis=0)
+    center = np.divide(filled.sum(axis=0), counts, out=np.zeros(k), where=counts > 0)
+    x = np.where(missing, 0.0, filled - center)
+
+    sums = np.zeros(k)
+    cross = np.zeros((k, k))
+    missing_count = np.zeros(k, dtype='int64')
+
+    for t in range(n):
+        row = x[t]
+        sums += row
+        cross += np.outer(row, row)
+        missing_count += missing[t]
+
+        # Drops the row that just left the window
+        if t >= window:
+            old = x[t - window]
+            sums -= old
+            cross -= np.outer(old, old)
+            missing_count -= missing[t - window]
+
+        if t >= window - 1:
+            mean = sums / window
+            # Sample covariance so it matches pandas rolling cov/corr (ddof=1)
+            cov = (cross - window * np.outer(mean, mean)) / (window - 1)
+            yield t, mean + center, cov, missing_count == 0
+
+# Sets the pairs where either column had a missing return in the window to nan, same as pandas rolling with min_periods=window
+def _mask_incomplete(matrix, complete):
+    if not complete.all():
+        matrix[~complete, :] = np.nan
+        matrix[:, ~complete] = np.nan
+    return matrix
+
+# Calculates the rolling covariance matrix of every index column, returns an array shaped (dates, indexes, indexes)
+def rolling_cov_matrices(df, window, date='date', dtype=None):
+    returns = df.drop(date, axis=1)
+    values = returns.to_numpy(dtype=COMPUTE_DTYPE, na_value=np.nan)
+    n, k = values.shape
+
+    # The first window - 1 dates don't have a full window so they stay as nan like pandas rolling
+    covs = np.full((n, k, k), np.nan, dtype=to_storage_dtype(dtype))
+    for t, _, cov, complete in _rolling_moments(values, window):
+        covs[t] = _mask_incomplete(cov, complete)
+
+    return covs, pd.DatetimeIndex(df[date]), list(returns.columns)
+
+# Calculates the rolling correlation matrix of every index column, returns an array shaped (dates, indexes, indexes)
+def rolling_corr_matrices(df, window, date='date', dtype=None):
+    returns = df.drop(date, axis=1)
+    values = returns.to_numpy(dtype=COMPUTE_DTYPE, na_value=np.nan)
+    n, k = values.shape
+
+    corrs = np.full((n, k, k), np.nan, dtype=to_storage_dtype(dtype))
+    for t, _, cov, complete in _rolling_moments(values, window):
+        # Scales each covariance by the standard deviations found on the diagonal before it gets cast down
+        std = np.sqrt(np.diagonal(cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corrs[t] = _mask_incomplete(cov / np.outer(std, std), complete)
+
+    return corrs, pd.DatetimeIndex(df[date]), list(returns.columns)
+
+# Calculates the rolling correlation of every pair of index columns, only keeping the upper triangle of each matrix
+# Gives back an array shaped (dates, pairs) which is less than half the size of the full matrices, the pairs are in np.triu_indices(k, 1) order
+def rolling_corr_condensed(df, window, date='date', dtype=None):
+    returns = df.drop(date, axis=1)
+    values = returns.to_numpy(dtype=COMPUTE_DTYPE, na_value=np.nan)
+    n, k = values.shape
+    rows, cols = np.triu_indices(k, 1)
+
+    corrs = np.full((n, len(rows)), np.nan, dtype=to_storage_dtype(dtype))
+    for t, _, cov, complete in _rolling_moments(values, window):
+        std = np.sqrt(np.diagonal(cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corrs[t] = np.where(complete[rows] & complete[cols], cov[rows, cols] / (std[rows] * std[cols]), np.nan)
+
+    return corrs, pd.DatetimeIndex(df[date]), list(returns.columns)
+
+# Gives back where the pair of columns i and j is stored in the condensed upper triangle
+def _condensed_position(i, j, k):
+    i, j = min(i, j), max(i, j)
+    return i * k - i * (i + 1) // 2 + (j - i - 1)
+
+# Pulls the rolling correlation for each pair of indexes out of the full or condensed matrices into a df for simple plotting
+def corr_pairs_to_df(corrs, dates, columns, pairs):
+    position = {col: i for i, col in enumerate(columns)}
+
+    pair_cols = {}
+    for a, b in pairs:
+        if corrs.ndim == 2:
+            pair_cols[f"{a} / {b}"] = corrs[:, _condensed_position(position[a], position[b], len(columns))]
+        else:
+            pair_cols[f"{a} / {b}"] = corrs[:, position[a], position[b]]
+
+    return pd.DataFrame(pair_cols, index=dates)
+
+# Calculates the drawdown from the running peak of the cumulative return
+def compute_drawdown(df, col):
+    wealth = np.exp(np.log1p(df[col].astype(COMPUTE_DTYPE)).cumsum())
+    running_peak = wealth.cummax()
+    return wealth / running_peak - 1
+
+# Calculates how many trading days each point has been below its running peak
+def compute_drawdown_duration(df, col):
+    drawdown = compute_drawdown(df, col).to_numpy()
+
+    duration = np.zeros(len(drawdown), dtype='int64')
+    for i in range(len(drawdown)):
+        # Resets the count every time a new peak is reached
+        if drawdown[i] < 0:
+            duration[i] = duration[i - 1] + 1 if i > 0 else 1
+
+    return pd.Series(duration, index=df.index, name=col)
+
+# Calculates the drawdown, max drawdown and drawdown duration of the returns column
+def compute_drawdowns(df, dtype=None):
+    returns_col = df.columns[1]
+
+    df = df.copy()
+    df.set_index('date', inplace=True)
+
+    drawdown = compute_drawdown(df, returns_col).astype(to_storage_dtype(dtype))
+
+    # Returns the values in a dataframe format for simple plotting and use
+    return pd.DataFrame({
+        'date': df.index,
+        'drawdown': drawdown,
+        'max_drawdown': drawdown.cummin(),
+        'drawdown_duration': compute_drawdown_duration(df, returns_col)
+    }, index=df.index)
@@ -4,27 +4,48 @@ import numpy as np
 
 '''
 Has any sort of math function that we are use relatively often. 
+The values are stored and sent to the plots in the storage dtype (float32 by default) which halves the memory and payload size,
+while anything that adds up a lot of values (cumprod, rolling sums, rolling variance) is calculated in float64 and cast back at the end
 '''
 
+#### DTYPES ####
+COMPUTE_DTYPE = 'float64'
+STORAGE_DTYPE = 'float32'
+
+# Allows for switching the storage dtype, float64 gives back the full precision output
+def set_storage_dtype(dtype):
+    global STORAGE_DTYPE
+    if np.dtype(dtype) not in (np.float32, np.float64):
+        raise ValueError(f"Storage dtype must be float32 or float64, got {dtype}")
+    STORAGE_DTYPE = np.dtype(dtype).name
+
+# Gives back the dtype to store values in, uses the module setting when one isn't given
+def to_storage_dtype(dtype=None):
+    return STORAGE_DTYPE if dtype is None else np.dtype(dtype).name
+
+# Compounds the returns in float64 log space, same as the rolling returns, so long histories don't drift in float32
+def _compound(returns):
+    return np.expm1(np.log1p(returns.astype(COMPUTE_DTYPE)).cumsum())
+
 # Creating function so that we calc the cumulative return of the entire df
-def compute_df_cumulative(df):
-    return (1 + df.drop('date', axis=1)).cumprod() - 1
+def compute_df_cumulative(df, dtype=None):
+    return _compound(df.drop('date', axis=1)).astype(to_storage_dtype(dtype))
 
 # Function so that we calculate the cumulative return of a specific column
-def compute_col_cumulative(df, col):
-    return (1 + df[col]).cumprod() - 1
+def compute_col_cumulative(df, col, dtype=None):
+    return _compound(df[col]).astype(to_storage_dtype(dtype))
 
 # Function so that we can calculate the annualized return
-def annualized_return(df, col, date1, date2):
-    cumulative_return = compute_col_cumulative(df, col)
+def annualized_return(df, col, date1, date2, dtype=None):
+    log_growth = np.log1p(df[col].astype(COMPUTE_DTYPE)).cumsum()
     # Dates need to be given in this form date(2023, 2, 15)
     difference = date2 - date1
     days = difference.days
     
-    return ((1 + cumulative_return) ** (365 / days)) - 1
+    return np.expm1(log_growth * (365 / days)).astype(to_storage_dtype(dtype))
 
 # Calculates the rolling returns a time period
-def compute_rolling_returns(df, time_period, risk_free_rate):
+def compute_rolling_returns(df, time_period, risk_free_rate, dtype=None):
     returns_col = df.columns[1]
     
     days = time_period * 252
@@ -32,9 +53,14 @@ def compute_rolling_returns(df, time_period, risk_free_rate):
     df = df.copy()
     df.set_index('date', inplace=True)
 
-    returns = df[returns_col]
+    # Always accumulates in float64 even when the stored returns are float32
+    returns = df[returns_col].astype(COMPUTE_DTYPE)
+
+    # Compounds in log space so the products become sums that can be rolled without rounding drift
+    log_returns = np.log1p(returns)
+
     # Total rolling returns
-    rolling_total = (1 + returns).rolling(days).apply(np.prod, raw=True) - 1
+    rolling_total = np.expm1(log_returns.rolling(days).sum())
 
     # Annualized return calculation
     rolling_annualized = (1 + rolling_total) ** (252 / days) - 1
@@ -43,16 +69,16 @@ def compute_rolling_returns(df, time_period, risk_free_rate):
     rolling_volatility = returns.rolling(days).std() * np.sqrt(252)
 
     # Cumulative return calculation
-    cumulative_return = (1 + returns).cumprod() - 1
+    cumulative_return = np.expm1(log_returns.cumsum())
 
     # Rolling cumulative return 
-    rolling_cumulative_return = (1 + returns).rolling(days).apply(np.prod, raw=True) - 1
+    rolling_cumulative_return = rolling_total
 
     # Rolling Sharpe Ratio
     rolling_sharpe = (rolling_annualized - risk_free_rate) / rolling_volatility
     
     # Returns the values in a dataframe format for simple plotting and use
-    return pd.DataFrame({
+    rolling_df = pd.DataFrame({
         'date': returns.index,
         'cumulative_return': cumulative_return,
         'rolling_cumulative_return': rolling_cumulative_return,
@@ -62,6 +88,12 @@ def compute_rolling_returns(df, time_period, risk_free_rate):
         
     }, index=returns.index)
 
+    # Casts back to the storage dtype only once all the calculations are done
+    value_cols = rolling_df.columns.drop('date')
+    rolling_df[value_cols] = rolling_df[value_cols].astype(to_storage_dtype(dtype))
+
+    return rolling_df
+
 # Calculates the z-score for a specified column
 def z_score(df, col):
     return (df[col].iloc[-1] - df[col].mean()) / df[col].std()
@@ -1,6 +1,7 @@
 import pandas as pd
 import random
-from .calcs import z_score, annualized_return, compute_col_cumulative
+from .calcs import z_score, annualized_return, compute_col_cumulative, to_storage_dtype
+from .summary import stats_z_score, stats_mean, stats_annualized_return
 
 '''
 Complete data preperation including adding the quarter_year column, creating the z_scores, and selecting only single indexs in their own df's
@@ -19,14 +20,15 @@ def data_info(df):
     print(df.dtypes, "\n")
 
 # Splits a data with indexes as headers into seperate dfs
-def split_columns_to_dfs(df, date):
+def split_columns_to_dfs(df, date, dtype=None):
     df[date] = pd.to_datetime(df[date])
     df = df.copy()
     
     dfs = {}
     for col in df.columns:
         if col != date:
-            dfs[col] = df[[date, col]].copy()
+            # Stores the returns in the smaller dtype, the calcs upcast when they need the precision
+            dfs[col] = df[[date, col]].astype({col: to_storage_dtype(dtype)})
     
     return dfs
 
@@ -44,24 +46,31 @@ def color_selection(number):
               "#02ADAD", "#0e0088", '#9a6324', "#A30101", "#42e072", '#808000', "#c56c13", '#000075', '#808080']
     return random.sample(colors, number)
 
-# Adds a column that has the quarter and year combined
-def data_prep(df, security, col):
+# Converts the date and value columns and adds the year and quarter, done once for the whole df
+def _add_date_columns(df, col):
     # Ensures the values are correct and smaller forms for better runtimes
     df['date'] = pd.to_datetime(df['date'])
-    df[col] = df[col].astype('float32')
+    df[col] = df[col].astype(to_storage_dtype())
 
     df['year'] = df['date'].dt.year
     df['quarter'] = df['date'].dt.quarter
-    
-    subset = df[df['security'] == security].copy()
-    
-    # Concatenates the quarter and year together to create an easy to read notation
+
+# Concatenates the quarter and year together to create an easy to read notation
+def _add_quarter_year(subset):
     subset['quarter'] = subset['quarter'].astype(str)
     subset['year'] = subset['year'].astype(str)
     subset['quarter_year'] = 'Q' + subset['quarter'] + ' ' + subset['year']    
     
     return subset
 
+# Adds a column that has the quarter and year combined
+def data_prep(df, security, col):
+    _add_date_columns(df, col)
+    
+    subset = df[df['security'] == security].copy()
+    
+    return _add_quarter_year(subset)
+
 # Splits apart the indexes and puts them into a dictionary, good for a column with many different indexes
 def prep_dfs(df, index_list, column_name):
     prepared_dfs = {}
@@ -71,26 +80,58 @@ def prep_dfs(df, index_list, column_name):
 
     return prepared_dfs
 
+# Calculates the z-score, mean or annualized return of each index before it is formatted for the tables
+# With a stats df from build_period_stats the calc is a lookup, z-score and mean still use the full history like the scan,
+# annualized return compounds the whole periods that overlap date1 to date2 (see stats_annualized_return)
+def index_calculations(df, index_list, column_name, calc=None, date1=None, date2=None, stats=None, groups=None):
+    stats_values = None
+    if stats is not None:
+        if (calc == 'z-score'):
+            stats_values = stats_z_score(stats)
+        elif (calc == 'mean'):
+            stats_values = stats_mean(stats)
+        elif (calc == 'annualized return'):
+            stats_values = stats_annualized_return(stats, date1, date2)
+
+    # Splits the df by security in one pass instead of filtering for each index, only needed when scanning
+    if stats_values is None and groups is None:
+        groups = {security: group for security, group in df.groupby('security', sort=False)}
+
+    values = {}
+    for index in index_list:
+        if stats_values is not None:
+            values[index] = stats_values[index]
+            continue
+
+        index_df = groups.get(index, df.iloc[0:0])
+        if (calc == 'z-score'):
+            values[index] = z_score(index_df, column_name)
+        elif (calc == 'mean'):
+            values[index] = index_df[column_name].mean()
+        elif (calc == 'annualized return'):
+            values[index] = annualized_return(index_df, column_name, date1, date2)
+        else:
+            values[index] = 0
+
+    return values
+
 # Creates a z-score, table, and prepared df based on the df, indexs, and column name given
-def process_indices(df, index_list, column_name, calc=None, date1=None, date2=None):
+def process_indices(df, index_list, column_name, calc=None, date1=None, date2=None, stats=None):
     # Creates blank dictionaries to be filled 
     calculation = {}
     tables = {}
     prepared_dfs = {}
 
+    # Prepares the shared columns once and splits the df by security in one pass instead of filtering for each index
+    _add_date_columns(df, column_name)
+    groups = {security: group for security, group in df.groupby('security', sort=False)}
+    empty_df = df.iloc[0:0]
+
+    values = index_calculations(df, index_list, column_name, calc, date1, date2, stats, groups)
+
     # Iterates over all the values in the index list and creates the specified lists
     for index in index_list:
-        # Filter the dataframe based on the index given
-        index_df = df[df['security'] == index]
-
-        if (calc == 'z-score'):
-            val = z_score(index_df, column_name)
-        elif (calc == 'mean'):
-            val = index_df[column_name].mean()
-        elif (calc == 'annualized return'):
-            val = annualized_return(index_df, column_name, date1, date2)
-        else:
-            val = 0
+        val = values[index]
 
         calculation[index] = f"{val:.2f}"
 
@@ -98,7 +139,7 @@ def process_indices(df, index_list, column_name, calc=None, date1=None, date2=No
         tables[index] = pd.DataFrame({calc: [f"{val:.2f}"]})
         
         # Prepare data with new column and only the specified index
-        prepared_dfs[index] = data_prep(df, index, column_name)
+        prepared_dfs[index] = _add_quarter_year(groups.get(index, empty_df).copy())
 
     return calculation, tables, prepared_dfs
 
@@ -0,0 +1,96 @@
+import pandas as pd
+import numpy as np
+from .calcs import COMPUTE_DTYPE
+
+'''
+Precomputed summary statistics so the KPI tables don't have to filter and scan the full df for every index
+The stats df is built once per period (month, quarter or year) and holds the count, sum, sum of squares and compounded growth of each security in each period
+Any range of periods can then be answered by adding up the stored rows, which gives the mean, z-score and annualized return for every security at once
+Ranges are given as the first and last period to include, any date inside a period selects the whole period,
+so the mean, z-score (last value is the last one in last_period) and annualized return cover those whole periods
+and not the exact dates, use a smaller period when more exact ranges are needed
+'''
+
+PERIODS = {'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+
+# Builds the stats df indexed by security and period, from a df with a security, date and value column
+def build_period_stats(df, column_name, period='quarter'):
+    dates = pd.to_datetime(df['date'])
+
+    # Everything is added up in float64 so the sums of squares don't lose precision
+    values = df[column_name].astype(COMPUTE_DTYPE)
+
+    data = pd.DataFrame({
+        'security': df['security'],
+        'period': dates.dt.to_period(PERIODS[period]),
+        'date': dates,
+        'value': values,
+        'value_sq': values ** 2,
+        'log_growth': np.log1p(values)
+    }).sort_values(['security', 'date'])
+
+    # Each return covers the time since the previous trading day, the first one of a security is taken as one day
+    data['start_date'] = data.groupby('security', sort=False)['date'].shift(1).fillna(data['date'] - pd.Timedelta(days=1))
+
+    grouped = data.groupby(['security', 'period'], sort=True)
+
+    return pd.DataFrame({
+        'count': grouped['value'].count(),
+        'sum': grouped['value'].sum(),
+        'sum_sq': grouped['value_sq'].sum(),
+        'log_growth': grouped['log_growth'].sum(),
+        'last_value': grouped['value'].last(),
+        'first_date': grouped['date'].min(),
+        'last_date': grouped['date'].max(),
+        'start_date': grouped['start_date'].min()
+    })
+
+# Adds the stored periods from first_period to last_period together, gives back one row per security
+def combine_periods(stats, first_period=None, last_period=None):
+    # A period is included when any of its dates falls between the two dates given
+    mask = np.ones(len(stats), dtype=bool)
+    if first_period is not None:
+        mask &= stats['last_date'] >= pd.Timestamp(first_period)
+    if last_period is not None:
+        mask &= stats['first_date'] <= pd.Timestamp(last_period)
+
+    # The periods are sorted so the last value comes from the latest period
+    grouped = stats[mask].groupby(level='security', sort=False)
+
+    return pd.DataFrame({
+        'count': grouped['count'].sum(),
+        'sum': grouped['sum'].sum(),
+        'sum_sq': grouped['sum_sq'].sum(),
+        'log_growth': grouped['log_growth'].sum(),
+        'last_value': grouped['last_value'].last(),
+        'first_date': grouped['first_date'].min(),
+        'last_date': grouped['last_date'].max(),
+        'start_date': grouped['start_date'].min()
+    })
+
+# Calculates the mean of every security over the whole periods
+def stats_mean(stats, first_period=None, last_period=None):
+    combined = combine_periods(stats, first_period, last_period)
+    return combined['sum'] / combined['count']
+
+# Calculates the z-score of the last value of every security over the whole periods
+def stats_z_score(stats, first_period=None, last_period=None):
+    combined = combine_periods(stats, first_period, last_period)
+    count = combined['count']
+    mean = combined['sum'] / count
+
+    # Sample standard deviation so it matches pandas std (ddof=1)
+    std = np.sqrt((combined['sum_sq'] - count * mean ** 2) / (count - 1))
+
+    return (combined['last_value'] - mean) / std
+
+# Calculates the annualized return of every security over the whole periods
+def stats_annualized_return(stats, first_period=None, last_period=None):
+    combined = combine_periods(stats, first_period, last_period)
+
+    # Annualizes over the time the compounded returns actually cover, from the trading day before the first return to the last one,
+    # not the dates given since those snap to the periods
+    days = (combined['last_date'] - combined['start_date']).dt.days
+    years = (days / 365).where(days > 0)
+
+    return np.expm1(combined['log_growth'] / years)
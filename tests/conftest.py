@@ -0,0 +1,17 @@
+import pandas as pd
+import pytest
+from pathlib import Path
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'data' / '10Y_Daily_Returns.csv'
+
+# Reads the bundled returns once for the whole run
+@pytest.fixture(scope='session')
+def _daily_returns():
+    df = pd.read_csv(DATA_PATH)
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+# The bundled daily returns with a date column and one column per index, a fresh copy for each test since the calcs change dfs in place
+@pytest.fixture
+def daily_df(_daily_returns):
+    return _daily_returns.copy()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from itertools import combinations
+from psf_library.analytics import rolling_cov_matrices, rolling_corr_matrices, rolling_corr_condensed, corr_pairs_to_df, compute_drawdowns
+
+# Indexes that start on different dates and have a gap, like a large universe would
+@pytest.fixture
+def gappy_df(daily_df):
+    df = daily_df.copy()
+    df.loc[:299, 'MXEA Index'] = np.nan
+    df.loc[:999, 'MXWOU Index'] = np.nan
+    df.loc[1500:1504, 'SPW Index'] = np.nan
+    return df
+
+def test_rolling_corr_matches_pandas(daily_df):
+    corrs, dates, columns = rolling_corr_matrices(daily_df, 252, dtype='float64')
+    returns = daily_df.set_index('date')
+
+    for i, j in combinations(range(len(columns)), 2):
+        expected = returns[columns[i]].rolling(252).corr(returns[columns[j]]).to_numpy()
+        np.testing.assert_allclose(corrs[:, i, j], expected, rtol=0, atol=1e-12)
+
+def test_rolling_cov_matches_pandas(daily_df):
+    covs, dates, columns = rolling_cov_matrices(daily_df, 252, dtype='float64')
+    expected = daily_df.set_index('date').rolling(252).cov()
+
+    for t in [251, 1000, len(dates) - 1]:
+        np.testing.assert_allclose(covs[t], expected.loc[dates[t]].to_numpy(), rtol=1e-10, atol=1e-16)
+
+def test_rolling_corr_missing_returns_match_pandas(gappy_df):
+    corrs, dates, columns = rolling_corr_matrices(gappy_df, 252, dtype='float64')
+    returns = gappy_df.set_index('date')
+
+    for i, j in combinations(range(len(columns)), 2):
+        expected = returns[columns[i]].rolling(252).corr(returns[columns[j]]).to_numpy()
+        np.testing.assert_array_equal(np.isnan(corrs[:, i, j]), np.isnan(expected))
+        np.testing.assert_allclose(corrs[:, i, j], expected, rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize('fixture', ['daily_df', 'gappy_df'])
+def test_rolling_corr_condensed_matches_matrices(request, fixture):
+    df = request.getfixturevalue(fixture)
+    corrs, dates, columns = rolling_corr_matrices(df, 252, dtype='float64')
+    condensed, _, _ = rolling_corr_condensed(df, 252, dtype='float64')
+
+    rows, cols = np.triu_indices(len(columns), 1)
+    assert condensed.shape == (len(dates), len(rows))
+    np.testing.assert_array_equal(condensed, corrs[:, rows, cols])
+
+    # Either order of a pair gives the same column from the condensed array
+    pairs = list(combinations(columns, 2)) + [(b, a) for a, b in combinations(columns, 2)]
+    pd.testing.assert_frame_equal(corr_pairs_to_df(condensed, dates, columns, pairs),
+                                  corr_pairs_to_df(corrs, dates, columns, pairs))
+
+def test_corr_pairs_to_df(daily_df):
+    corrs, dates, columns = rolling_corr_matrices(daily_df, 252)
+    pairs_df = corr_pairs_to_df(corrs, dates, columns, [('SPX Index', 'SPW Index')])
+
+    assert list(pairs_df.columns) == ['SPX Index / SPW Index']
+    assert pairs_df.iloc[:251].isna().all().all()
+    assert pairs_df.iloc[251:].notna().all().all()
+
+def test_compute_drawdowns(daily_df):
+    drawdowns = compute_drawdowns(daily_df[['date', 'SPX Index']], dtype='float64')
+
+    wealth = (1 + daily_df['SPX Index']).cumprod().to_numpy()
+    expected = wealth / np.maximum.accumulate(wealth) - 1
+    np.testing.assert_allclose(drawdowns['drawdown'], expected, atol=1e-12)
+    assert (drawdowns['drawdown'] <= 0).all()
+    assert (drawdowns['max_drawdown'] <= drawdowns['drawdown']).all()
+    assert (drawdowns['drawdown_duration'][drawdowns['drawdown'] == 0] == 0).all()
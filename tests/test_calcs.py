@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date
+from psf_library.calcs import compute_rolling_returns, compute_df_cumulative, compute_col_cumulative, annualized_return, set_storage_dtype, to_storage_dtype
+from psf_library.cleaning import split_columns_to_dfs, data_prep
+
+# Largest absolute error allowed between the float32 storage output and the float64 baseline
+FLOAT32_ATOL = 5e-7
+
+# The float64 rolling returns as they were calculated before the storage dtype, used as the baseline
+def baseline_rolling_returns(df, time_period, risk_free_rate):
+    returns = df.set_index('date')[df.columns[1]]
+    days = time_period * 252
+
+    rolling_total = (1 + returns).rolling(days).apply(np.prod, raw=True) - 1
+    rolling_annualized = (1 + rolling_total) ** (252 / days) - 1
+    rolling_volatility = returns.rolling(days).std() * np.sqrt(252)
+
+    return pd.DataFrame({
+        'cumulative_return': (1 + returns).cumprod() - 1,
+        'rolling_cumulative_return': rolling_total,
+        'annualized_return': rolling_annualized,
+        'rolling_volatility': rolling_volatility,
+        'rolling_sharpe': (rolling_annualized - risk_free_rate) / rolling_volatility
+    }, index=returns.index)
+
+def test_split_columns_to_dfs_float32(daily_df):
+    split64 = split_columns_to_dfs(daily_df.copy(), 'date', dtype='float64')
+    split32 = split_columns_to_dfs(daily_df.copy(), 'date', dtype='float32')
+
+    for index, df in split32.items():
+        assert df[index].dtype == np.float32
+        assert split64[index][index].dtype == np.float64
+        np.testing.assert_allclose(df[index].astype('float64'), split64[index][index], rtol=0, atol=1e-8)
+
+@pytest.mark.parametrize('window', [1, 3, 5])
+def test_rolling_returns_float32_error_bound(daily_df, window):
+    split64 = split_columns_to_dfs(daily_df.copy(), 'date', dtype='float64')
+    split32 = split_columns_to_dfs(daily_df.copy(), 'date', dtype='float32')
+
+    for index in split32:
+        expected = baseline_rolling_returns(split64[index], window, 0.04)
+        result = compute_rolling_returns(split32[index], window, 0.04, dtype='float32')
+
+        for col in expected.columns:
+            assert result[col].dtype == np.float32
+            np.testing.assert_array_equal(result[col].isna(), expected[col].isna())
+            np.testing.assert_allclose(result[col].astype('float64'), expected[col], rtol=0, atol=FLOAT32_ATOL, equal_nan=True)
+
+def test_rolling_returns_float64_matches_baseline(daily_df):
+    split64 = split_columns_to_dfs(daily_df.copy(), 'date', dtype='float64')
+
+    for index, df in split64.items():
+        expected = baseline_rolling_returns(df, 3, 0.04)
+        result = compute_rolling_returns(df, 3, 0.04, dtype='float64')
+
+        for col in expected.columns:
+            np.testing.assert_allclose(result[col], expected[col], rtol=1e-10, atol=1e-12, equal_nan=True)
+
+def test_cumulative_float32_error_bound(daily_df):
+    returns64 = daily_df.drop('date', axis=1)
+    returns32 = returns64.astype('float32')
+    expected = (1 + returns64).cumprod() - 1
+
+    result = compute_df_cumulative(daily_df.astype({col: 'float32' for col in returns64.columns}))
+    assert (result.dtypes == np.float32).all()
+    np.testing.assert_allclose(result.astype('float64'), expected, rtol=0, atol=FLOAT32_ATOL)
+
+    for col in returns64.columns:
+        result = compute_col_cumulative(returns32, col)
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result.astype('float64'), expected[col], rtol=0, atol=FLOAT32_ATOL)
+
+        np.testing.assert_allclose(compute_col_cumulative(returns64, col, dtype='float64'), expected[col], rtol=1e-10)
+
+def test_annualized_return_float32_error_bound(daily_df):
+    date1, date2 = date(2015, 6, 1), date(2025, 5, 30)
+
+    for col in daily_df.columns.drop('date'):
+        expected = ((1 + daily_df[col]).cumprod() ** (365 / (date2 - date1).days)) - 1
+        result = annualized_return(daily_df.astype({col: 'float32'}), col, date1, date2)
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result.astype('float64'), expected, rtol=0, atol=FLOAT32_ATOL)
+
+def test_data_prep_uses_storage_dtype(daily_df):
+    long_df = daily_df.melt(id_vars='date', var_name='security', value_name='value')
+    assert data_prep(long_df.copy(), 'SPX Index', 'value')['value'].dtype == np.float32
+
+    try:
+        set_storage_dtype('float64')
+        assert data_prep(long_df.copy(), 'SPX Index', 'value')['value'].dtype == np.float64
+    finally:
+        set_storage_dtype('float32')
+
+def test_set_storage_dtype():
+    try:
+        set_storage_dtype('float64')
+        assert to_storage_dtype() == 'float64'
+        with pytest.raises(ValueError):
+            set_storage_dtype('int32')
+    finally:
+        set_storage_dtype('float32')
+    assert to_storage_dtype() == 'float32'
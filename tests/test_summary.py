@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date
+from psf_library.calcs import z_score
+from psf_library.cleaning import data_prep, process_indices, index_calculations
+from psf_library.summary import build_period_stats, combine_periods, stats_mean, stats_z_score, stats_annualized_return
+
+# The bundled returns in the long security/date/value layout the tables use
+@pytest.fixture
+def long_df(daily_df):
+    return daily_df.melt(id_vars='date', var_name='security', value_name='value')
+
+# Scan over the rows between two dates, the baseline the stats are checked against
+def scan(long_df, security, start=None, end=None):
+    rows = long_df[long_df['security'] == security]
+    if start is not None:
+        rows = rows[rows['date'] >= pd.Timestamp(start)]
+    if end is not None:
+        rows = rows[rows['date'] <= pd.Timestamp(end)]
+    return rows
+
+# The first return covers the time since the previous trading day, so the span starts there (one day back for the first row)
+def scan_annualized_return(long_df, rows):
+    security_dates = long_df.loc[long_df['security'] == rows['security'].iloc[0], 'date']
+    earlier = security_dates[security_dates < rows['date'].iloc[0]]
+    start = earlier.iloc[-1] if len(earlier) else rows['date'].iloc[0] - pd.Timedelta(days=1)
+
+    days = (rows['date'].iloc[-1] - start).days
+    return (1 + rows['value']).prod() ** (365 / days) - 1
+
+@pytest.mark.parametrize('period', ['month', 'quarter', 'year'])
+def test_full_history_matches_scan(long_df, period):
+    stats = build_period_stats(long_df, 'value', period)
+    means = stats_mean(stats)
+    z_scores = stats_z_score(stats)
+
+    for security in long_df['security'].unique():
+        rows = scan(long_df, security)
+        assert means[security] == pytest.approx(rows['value'].mean(), rel=1e-12)
+        assert z_scores[security] == pytest.approx(z_score(rows, 'value'), rel=1e-9)
+
+def test_combine_periods_counts(long_df):
+    stats = build_period_stats(long_df, 'value', 'month')
+    combined = combine_periods(stats, date(2020, 2, 14), date(2020, 3, 2))
+
+    # Mid month dates select all of February and March
+    rows = scan(long_df, 'SPX Index', '2020-02-01', '2020-03-31')
+    assert combined.loc['SPX Index', 'count'] == len(rows)
+    assert combined.loc['SPX Index', 'first_date'] == rows['date'].iloc[0]
+    assert combined.loc['SPX Index', 'last_date'] == rows['date'].iloc[-1]
+    assert combined.loc['SPX Index', 'last_value'] == rows['value'].iloc[-1]
+
+def test_annualized_return_aligned_range(long_df):
+    stats = build_period_stats(long_df, 'value', 'quarter')
+    result = stats_annualized_return(stats, date(2020, 1, 1), date(2023, 12, 31))
+
+    for security in long_df['security'].unique():
+        rows = scan(long_df, security, '2020-01-01', '2023-12-31')
+        assert result[security] == pytest.approx(scan_annualized_return(long_df, rows), rel=1e-10)
+
+def test_annualized_return_unaligned_range(long_df):
+    stats = build_period_stats(long_df, 'value', 'quarter')
+    result = stats_annualized_return(stats, date(2020, 2, 14), date(2020, 3, 2))
+
+    # The range snaps to Q1 2020 and is annualized over the days of Q1 that were compounded
+    rows = scan(long_df, 'SPX Index', '2020-01-01', '2020-03-31')
+    assert result['SPX Index'] == pytest.approx(scan_annualized_return(long_df, rows), rel=1e-10)
+
+    # Q1 2020 runs from the close on 2019-12-31 to 2020-03-31, which is 91 days
+    assert result['SPX Index'] == pytest.approx((1 + rows['value']).prod() ** (365 / 91) - 1, rel=1e-10)
+    assert result['SPX Index'] > -0.9
+
+def test_snapped_mean_and_z_score(long_df):
+    stats = build_period_stats(long_df, 'value', 'month')
+    means = stats_mean(stats, date(2021, 5, 10), date(2022, 8, 20))
+    z_scores = stats_z_score(stats, date(2021, 5, 10), date(2022, 8, 20))
+
+    rows = scan(long_df, 'MXEA Index', '2021-05-01', '2022-08-31')
+    assert means['MXEA Index'] == pytest.approx(rows['value'].mean(), rel=1e-12)
+    assert z_scores['MXEA Index'] == pytest.approx(z_score(rows, 'value'), rel=1e-9)
+
+def test_annualized_return_first_period(long_df):
+    stats = build_period_stats(long_df, 'value', 'month')
+    result = stats_annualized_return(stats, date(2015, 6, 1), date(2015, 6, 30))
+
+    # The first return of a security is taken as covering one day
+    rows = scan(long_df, 'SPX Index', '2015-06-01', '2015-06-30')
+    assert result['SPX Index'] == pytest.approx(scan_annualized_return(long_df, rows), rel=1e-10)
+
+@pytest.mark.parametrize('calc', ['z-score', 'mean'])
+def test_index_calculations_stats_matches_scan(long_df, calc):
+    securities = list(long_df['security'].unique())
+    stats = build_period_stats(long_df, 'value', 'quarter')
+
+    # Dates are ignored for z-score and mean in both paths, the full history is used
+    scan_values = index_calculations(long_df, securities, 'value', calc, date(2020, 1, 1), date(2021, 1, 1))
+    stats_values = index_calculations(long_df, securities, 'value', calc, date(2020, 1, 1), date(2021, 1, 1), stats=stats)
+
+    for security in securities:
+        assert stats_values[security] == pytest.approx(scan_values[security], rel=1e-9)
+
+def test_index_calculations_stats_annualized_return(long_df):
+    securities = list(long_df['security'].unique())
+    stats = build_period_stats(long_df, 'value', 'month')
+    values = index_calculations(long_df, securities, 'value', 'annualized return', date(2019, 3, 12), date(2022, 7, 19), stats=stats)
+
+    # The dates snap to the start of March 2019 and the end of July 2022
+    for security in securities:
+        rows = scan(long_df, security, '2019-03-01', '2022-07-31')
+        assert values[security] == pytest.approx(scan_annualized_return(long_df, rows), rel=1e-10)
+
+@pytest.mark.parametrize('calc', ['z-score', 'mean', 'annualized return'])
+def test_process_indices_with_stats(long_df, calc):
+    securities = list(long_df['security'].unique())
+    stats = build_period_stats(long_df, 'value', 'quarter')
+
+    calculation, tables, prepared_dfs = process_indices(long_df.copy(), securities, 'value', calc, date(2020, 1, 1), date(2021, 1, 1), stats=stats)
+    values = index_calculations(long_df, securities, 'value', calc, date(2020, 1, 1), date(2021, 1, 1), stats=stats)
+
+    for security in securities:
+        assert calculation[security] == f"{values[security]:.2f}"
+        assert tables[security][calc].iloc[0] == calculation[security]
+        pd.testing.assert_frame_equal(prepared_dfs[security], data_prep(long_df.copy(), security, 'value'))